@@ -0,0 +1,207 @@
+"""
+保存済みの要約から週次・月次ダイジェストを作成するモジュール
+論文ごとの要約は再推論せず、TF-IDF による軽量なクラスタリングでトピックごとにまとめ、
+各論文のリンクの下に保存済み要約の抜粋を載せる（LLM はグループの見出し生成にのみ使う）
+"""
+
+import datetime
+import logging
+import math
+import re
+import time
+from collections import Counter
+
+from paper_index import recent_summaries
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAYS = {"week": 7, "month": 30}
+PERIOD_LABELS = {"week": "週間", "month": "月間"}
+
+# ダイジェストに載せる論文数とグループ数の上限
+TOP_N = 10
+MAX_GROUPS = 5
+MAX_PER_GROUP = 4
+# この類似度未満なら新しいグループを作る
+SIMILARITY_THRESHOLD = 0.15
+# 各論文の下に載せる要約の抜粋の最大文字数
+EXCERPT_LENGTH = 100
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "these", "those", "are",
+    "was", "were", "been", "being", "have", "has", "had", "its", "their", "our",
+    "which", "while", "also", "can", "such", "than", "into", "onto", "via", "using",
+    "based", "between", "across", "over", "under", "through", "both", "each", "more",
+    "most", "other", "not", "but", "all", "any", "how", "what", "when", "where",
+    "who", "why", "may", "might", "will", "would", "should", "could", "show",
+    "shows", "propose", "proposed", "present", "paper", "work", "approach",
+    "method", "methods", "results", "new", "novel", "towards", "toward",
+}
+
+
+def _tokenize(text: str) -> list[str]:
+    words = re.findall(r"[a-z][a-z0-9\-]+", text.lower())
+    return [w for w in words if len(w) >= 3 and w not in _STOPWORDS]
+
+
+def _tfidf_vectors(texts: list[str]) -> list[dict]:
+    """各テキストの TF-IDF ベクトル（L2 正規化済みの疎ベクトル）を返す"""
+    tokenized = [_tokenize(t) for t in texts]
+    df = Counter(w for tokens in tokenized for w in set(tokens))
+    n = len(texts)
+
+    vectors = []
+    for tokens in tokenized:
+        tf = Counter(tokens)
+        vec = {w: c * (math.log((1 + n) / (1 + df[w])) + 1) for w, c in tf.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        vectors.append({w: v / norm for w, v in vec.items()})
+    return vectors
+
+
+def _dot(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(w, 0.0) for w, v in a.items())
+
+
+def cluster_papers(papers: list[dict], threshold: float = SIMILARITY_THRESHOLD):
+    """
+    タイトルとアブストラクトの TF-IDF で論文を 1 パスでクラスタリングする
+    各論文を最も近いクラスタ（重心とのコサイン類似度が threshold 以上）に追加し、
+    無ければ新しいクラスタを作る
+    Returns:
+        List[dict]: {"papers": 入力順の論文, "keywords": 上位語} を大きい順に
+    """
+    # タイトルは重みを増すため 2 回入れる
+    vectors = _tfidf_vectors(
+        [f"{p['title']} {p['title']} {p.get('body') or ''}" for p in papers]
+    )
+
+    clusters = []
+    for i, vec in enumerate(vectors):
+        best, best_sim = None, threshold
+        for c in clusters:
+            sim = _dot(vec, c["centroid"]) / c["norm"]
+            if sim >= best_sim:
+                best, best_sim = c, sim
+        if best is None:
+            clusters.append({"centroid": dict(vec), "norm": 1.0, "members": [i]})
+            continue
+        for w, v in vec.items():
+            best["centroid"][w] = best["centroid"].get(w, 0.0) + v
+        best["norm"] = math.sqrt(sum(v * v for v in best["centroid"].values()))
+        best["members"].append(i)
+
+    clusters.sort(key=lambda c: len(c["members"]), reverse=True)
+
+    result = []
+    for c in clusters:
+        keywords = sorted(c["centroid"], key=c["centroid"].get, reverse=True)[:3]
+        result.append({"papers": [papers[i] for i in c["members"]], "keywords": keywords})
+    return result
+
+
+def _summary_excerpt(summary: str, max_length: int = EXCERPT_LENGTH) -> str:
+    """
+    保存済みの要約（summarize_paper_vllm の Slack 形式）から短い抜粋を取り出す
+    「結果」の見出しがあればその最初の項目、無ければ本文の最初の項目を使う
+    """
+    lines = [line.strip() for line in summary.splitlines() if line.strip()]
+    # 先頭の「*タイトル* <URL|[link]>」行は除く
+    if lines and "|[link]>" in lines[0]:
+        lines = lines[1:]
+
+    excerpt = ""
+    in_result = False
+    for line in lines:
+        if line.startswith("*") and line.endswith("*"):
+            in_result = "結果" in line
+            continue
+        text = line.lstrip("•- ").replace("*", "")
+        if not excerpt:
+            excerpt = text
+        if in_result:
+            excerpt = text
+            break
+
+    if len(excerpt) > max_length:
+        excerpt = excerpt[:max_length] + "…"
+    return excerpt
+
+
+def build_digest(period: str = "week", use_llm: bool = True):
+    """
+    期間内に要約した論文からダイジェストを作る
+    Args:
+        period (str): "week" または "month"
+        use_llm (bool): グループ見出しを LLM で生成するか（False ならキーワードを使う）
+    Returns:
+        (str, List[dict]): 見出し文字列と {"headline", "keywords", "papers"} のリスト
+            グループは大きい順、グループ内の論文は要約した日時の新しい順に並べ、
+            各論文には保存済み要約の抜粋 (excerpt) を付ける
+    """
+    days = PERIOD_DAYS[period]
+    papers = recent_summaries(time.time() - days * 24 * 60 * 60)
+
+    today = datetime.date.today()
+    start = today - datetime.timedelta(days=days)
+    title = f"📚 {PERIOD_LABELS[period]}ダイジェスト（{start.isoformat()} 〜 {today.isoformat()}）"
+
+    if not papers:
+        return title, []
+
+    # 2 本以上まとまったグループから順に採用し、残りは「その他」にまとめる
+    groups = []
+    leftovers = []
+    remaining = TOP_N
+    for cluster in cluster_papers(papers):
+        if remaining <= 0:
+            break
+        if len(cluster["papers"]) >= 2 and len(groups) < MAX_GROUPS:
+            newest_first = sorted(
+                cluster["papers"], key=lambda p: p["summarized_at"], reverse=True
+            )
+            taken = newest_first[:min(remaining, MAX_PER_GROUP)]
+            groups.append({"headline": "", "keywords": cluster["keywords"], "papers": taken})
+            remaining -= len(taken)
+        else:
+            leftovers.extend(cluster["papers"])
+
+    if remaining > 0 and leftovers:
+        leftovers.sort(key=lambda p: p["summarized_at"], reverse=True)
+        groups.append({"headline": "その他", "keywords": [], "papers": leftovers[:remaining]})
+
+    for g in groups:
+        for p in g["papers"]:
+            p["excerpt"] = _summary_excerpt(p["summary"])
+
+    topic_groups = [g for g in groups if not g["headline"]]
+    if use_llm and topic_groups:
+        # モデルのロードや推論に失敗した場合（OOM, GPU 無しなど）はキーワードの見出しにする
+        try:
+            from summarize import generate_digest_headlines
+
+            headlines = generate_digest_headlines(
+                [[p["title"] for p in g["papers"]] for g in topic_groups]
+            )
+            for g, headline in zip(topic_groups, headlines):
+                g["headline"] = headline
+        except Exception:
+            logger.error("見出しの生成に失敗したためキーワードを使います", exc_info=True)
+
+    for g in topic_groups:
+        if not g["headline"]:
+            g["headline"] = " / ".join(g["keywords"])
+
+    return title, groups
+
+
+if __name__ == "__main__":
+    digest_title, digest_groups = build_digest(use_llm=False)
+    print(digest_title)
+    for g in digest_groups:
+        print(f"\n## {g['headline']}")
+        for p in g["papers"]:
+            print(f"- {p['title']} ({p['url']})")
+            print(f"  {p['excerpt']}")
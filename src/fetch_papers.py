@@ -1,8 +1,14 @@
 import arxiv
 import datetime
 import json
+import logging
+import threading
 from pathlib import Path
 
+from paper_index import index_papers
+
+logger = logging.getLogger(__name__)
+
 POSTED_FILE = Path("logs/posted_papers.json")
 LOG_DIR = Path("logs")
 
@@ -23,14 +29,56 @@ def save_posted_ids(posted_ids):
     with open(POSTED_FILE, "w", encoding="utf-8") as f:
         json.dump(list(posted_ids), f, ensure_ascii=False, indent=2)
 
+
+# arXiv API のページサイズ（1 ページごとに delay_seconds の待ちが入る）
+PAGE_SIZE = 50
+
+# 呼び出し間でもリクエスト間隔が守られるようクライアントを共有する
+_client = arxiv.Client(page_size=PAGE_SIZE, delay_seconds=3.0, num_retries=3)
+# クライアントの待ち時間管理はスレッドセーフではないので、Bot の検索スレッドなどと排他する
+_client_lock = threading.Lock()
+
+
+class Paper:
+    """
+    論文 1 件分の情報
+    大量に取得しても軽いよう __slots__ を使い、後段へは to_dict() で渡す
+    """
+
+    __slots__ = ("id", "title", "summary", "url", "published", "updated")
+
+    def __init__(self, id, title, summary, url, published, updated):
+        self.id = id
+        self.title = title
+        self.summary = summary
+        self.url = url
+        self.published = published
+        self.updated = updated
+
+    @classmethod
+    def from_result(cls, result):
+        return cls(
+            id=result.entry_id.split("/")[-1],
+            title=result.title.strip().replace("\n", " "),
+            summary=result.summary.strip().replace("\n", " "),
+            url=result.entry_id,
+            published=result.published.strftime("%Y-%m-%d"),
+            updated=result.updated.strftime("%Y-%m-%d"),
+        )
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
 def fetch_papers(query: str = "cs.CL", max_results: int = 3):
     """
-    arXiv API から論文を取得する
+    arXiv API から論文を新着順に 1 件ずつ取得する
+    ページは必要になった時点で取得するので、途中で読むのをやめれば以降のリクエストは発生しない
     Args:
         query (str): 検索クエリ
         max_results (int): 取得する最大件数
-    Returns:
-        List[dict]: 論文情報（タイトル, 要約, URL, 投稿日など）
+    Yields:
+        Paper: 論文情報（タイトル, 要約, URL, 投稿日など）
     """
     search = arxiv.Search(
         query=query,
@@ -39,23 +87,38 @@ def fetch_papers(query: str = "cs.CL", max_results: int = 3):
         sort_order=arxiv.SortOrder.Descending,
     )
 
-    papers = []
-    for result in search.results():
-        papers.append({
-            "id": result.entry_id.split("/")[-1],
-            "title": result.title.strip().replace("\n", " "),
-            "summary": result.summary.strip().replace("\n", " "),
-            "url": result.entry_id,
-            "published": result.published.strftime("%Y-%m-%d"),
-            "updated": result.updated.strftime("%Y-%m-%d"),
-        })
-    return papers
+    results = _client.results(search)
+    while True:
+        # ページ取得（とリクエスト間隔の待ち）はロック中に行う
+        with _client_lock:
+            result = next(results, None)
+        if result is None:
+            return
+        yield Paper.from_result(result)
+
+
+def _take_new(papers, posted_ids, num, seen):
+    """
+    未投稿の論文を num 本集まった時点で読み込みを打ち切る
+    読んだ論文はすべて seen に追加する（インデックス登録用）
+    """
+    taken = []
+    if num <= 0:
+        return taken
+    for p in papers:
+        seen.append(p)
+        if p.id not in posted_ids:
+            taken.append(p.to_dict())
+            if len(taken) >= num:
+                break
+    return taken
 
 
 def select_papers(num_main: int = 3, num_survey: int = 1):
     """
     注目論文とサーベイ論文を選択
     - 過去に取得していない論文のみ
+    - 件数が揃った時点で arXiv へのリクエストを止める
     """
     posted_ids = load_posted_ids()
 
@@ -66,16 +129,24 @@ def select_papers(num_main: int = 3, num_survey: int = 1):
         "difficulty estimation OR readability OR summarization OR "
         "Machine Translation OR slm)"
     )
-    all_papers = fetch_papers(query=query, max_results=50)
-    new_papers = [p for p in all_papers if p["id"] not in posted_ids]
+    seen = []
 
-    # 注目論文: 先頭から num_main 本
-    selected = new_papers[:num_main]
+    # 注目論文: 未投稿のものを先頭から num_main 本
+    selected = _take_new(
+        fetch_papers(query=query, max_results=1000), posted_ids, num_main, seen
+    )
 
     # サーベイ論文: タイトルに "survey" を含むもの
-    survey_papers = fetch_papers(query=query + " AND survey", max_results=20)
-    survey_candidates = [p for p in survey_papers if p["id"] not in posted_ids]
-    survey = survey_candidates[:num_survey]
+    survey = _take_new(
+        fetch_papers(query=query + " AND survey", max_results=200),
+        posted_ids, num_survey, seen,
+    )
+
+    # 取得した論文はすべて検索インデックスに登録（失敗しても選別・投稿は続ける）
+    try:
+        index_papers(p.to_dict() for p in seen)
+    except Exception:
+        logger.error("取得した論文のインデックス登録に失敗", exc_info=True)
 
     # ログ保存
     today = datetime.date.today().isoformat()
@@ -7,6 +7,8 @@ import requests
 from bs4 import BeautifulSoup
 import trafilatura
 
+import url_cache
+
 # User-Agent を設定してブロックを回避
 HEADERS = {
     "User-Agent": (
@@ -35,20 +37,86 @@ def extract_urls(text: str) -> list[str]:
     return plain_urls
 
 
+def _extract_text(html: str, url: str) -> tuple[str, str]:
+    """
+    HTML からタイトルと本文テキストを抽出する（トランケート前）
+    """
+    # --- 1) trafilatura で本文抽出を試みる（精度が高い） ---
+    text = trafilatura.extract(html, include_comments=False, include_tables=True) or ""
+
+    # --- 2) trafilatura で取れなければ BeautifulSoup にフォールバック ---
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.string.strip() if soup.title and soup.title.string else url
+
+    if not text.strip():
+        for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
+            tag.decompose()
+
+        # <article> → <main> → <body> の順で取得
+        for container in [soup.find("article"), soup.find("main"), soup.find("body")]:
+            if container:
+                text = container.get_text(separator="\n", strip=True)
+                break
+        else:
+            text = soup.get_text(separator="\n", strip=True)
+
+    # 連続する空行を圧縮
+    text = re.sub(r'\n{3,}', '\n\n', text)
+
+    return title, text
+
+
+def _truncate(text: str, max_length: int) -> str:
+    """テキスト長を制限"""
+    if len(text) > max_length:
+        text = text[:max_length] + "\n\n...(以下省略)"
+    return text
+
+
+def _from_cache(entry: dict, url: str, max_length: int) -> dict:
+    """キャッシュエントリから fetch_webpage_text の戻り値を作る"""
+    return {
+        "title": entry["title"],
+        "text": _truncate(entry["text"], max_length),
+        "url": url,
+        # fetched_at の無い古いエントリは stored_at で代用（要約の再利用側では安全側に倒れる）
+        "fetched_at": entry.get("fetched_at", entry["stored_at"]),
+    }
+
+
 def fetch_webpage_text(url: str, max_length: int = MAX_TEXT_LENGTH) -> dict:
     """
     URLからWebページの本文テキストを取得する
+    抽出結果は url_cache にキャッシュし、TTL 切れ後は条件付き GET で再検証する
 
     Args:
         url: 取得対象のURL
         max_length: 返すテキストの最大文字数
 
     Returns:
-        dict: {"title": str, "text": str, "url": str}
+        dict: {"title": str, "text": str, "url": str, "fetched_at": float}
+              fetched_at は本文を抽出した時刻（キャッシュを再利用した場合はその抽出時刻）
               エラー時は {"title": "", "text": "", "url": url, "error": str}
     """
+    cached = url_cache.load(url)
+    if cached and url_cache.is_fresh(cached):
+        url_cache.mark_hit(cached)
+        return _from_cache(cached, url, max_length)
+
+    headers = {**HEADERS, **url_cache.conditional_headers(cached)}
+    try:
+        response = requests.get(url, headers=headers, timeout=15)
+    except requests.RequestException as e:
+        url_cache.mark_miss()
+        return {"title": "", "text": "", "url": url, "error": str(e)}
+
+    if response.status_code == 304 and cached:
+        url_cache.mark_revalidated(url, cached, response.headers)
+        return _from_cache(cached, url, max_length)
+
+    # 304 以外はキャッシュを使えなかったのでミスとして集計
+    url_cache.mark_miss()
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
         response.raise_for_status()
     except requests.RequestException as e:
         return {"title": "", "text": "", "url": url, "error": str(e)}
@@ -64,35 +132,10 @@ def fetch_webpage_text(url: str, max_length: int = MAX_TEXT_LENGTH) -> dict:
             "error": "PDF ファイルは現在未対応です。",
         }
 
-    html = response.text
-
-    # --- 1) trafilatura で本文抽出を試みる（精度が高い） ---
-    text = trafilatura.extract(html, include_comments=False, include_tables=True) or ""
-
-    # --- 2) trafilatura で取れなければ BeautifulSoup にフォールバック ---
-    soup = BeautifulSoup(html, "html.parser")
-    title = soup.title.string.strip() if soup.title and soup.title.string else url
-
-    if not text.strip():
-        for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
-            tag.decompose()
-
-        # <article> → <main> → <body> の順で取得
-        for container in [soup.find("article"), soup.find("main"), soup.find("body")]:
-            if container:
-                text = container.get_text(separator="\n", strip=True)
-                break
-        else:
-            text = soup.get_text(separator="\n", strip=True)
-
-    # 連続する空行を圧縮
-    text = re.sub(r'\n{3,}', '\n\n', text)
-
-    # テキスト長を制限
-    if len(text) > max_length:
-        text = text[:max_length] + "\n\n...(以下省略)"
+    title, text = _extract_text(response.text, url)
+    entry = url_cache.store(url, title, text, response.headers)
 
-    return {"title": title, "text": text, "url": url}
+    return _from_cache(entry, url, max_length)
 
 
 if __name__ == "__main__":
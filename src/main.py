@@ -2,24 +2,65 @@ import argparse
 
 
 def run_batch():
-    """既存の日次バッチ処理: 新着論文を取得→要約→Slack投稿"""
+    """
+    既存の日次バッチ処理: 新着論文を取得→要約→Slack投稿
+    モデルのロードは別プロセスで先に開始し、論文の取得と並行させる
+    """
+    import time
     from fetch_papers import select_papers
-    from summarize import summarize_papers_vllm
+    from summarize import BackgroundSummarizer
     from post_slack import post_papers_slack
 
-    # 論文を取得
-    selected_papers, survey_papers = select_papers(num_main=3, num_survey=1)
-    all_papers = selected_papers + survey_papers
+    batch_start = time.perf_counter()
 
-    if not all_papers:
-        print("新しい論文はありません。")
-        return
+    # モデルのロードを開始（論文取得と並行）
+    summarizer = BackgroundSummarizer()
+
+    # 途中で例外や中断があってもワーカーが残らないよう必ず停止する
+    try:
+        # 論文を取得
+        start = time.perf_counter()
+        selected_papers, survey_papers = select_papers(num_main=3, num_survey=1)
+        all_papers = selected_papers + survey_papers
+        print(f"[時間] 論文取得・選別: {time.perf_counter() - start:.1f} 秒")
 
-    # 論文を要約
-    summarized_papers = summarize_papers_vllm(all_papers)
+        if not all_papers:
+            # 要約不要なのでモデルのロードは finally で中止する
+            print("新しい論文はありません。")
+            print(f"[時間] 合計: {time.perf_counter() - batch_start:.1f} 秒")
+            return
+
+        # 論文を要約（ロード完了を待つ）
+        start = time.perf_counter()
+        summarized_papers = summarizer.summarize(all_papers)
+        print(f"[時間] モデルロード: {summarizer.load_seconds:.1f} 秒（論文取得と並行）")
+        print(f"[時間] 要約: {summarizer.summarize_seconds:.1f} 秒")
+        print(f"[時間] ロード待ち＋要約: {time.perf_counter() - start:.1f} 秒")
+    finally:
+        summarizer.cancel()
 
     # Slackに投稿
+    start = time.perf_counter()
     post_papers_slack(summarized_papers)
+    print(f"[時間] Slack 投稿: {time.perf_counter() - start:.1f} 秒")
+    print(f"[時間] 合計: {time.perf_counter() - batch_start:.1f} 秒")
+
+
+def run_digest(period: str, use_llm: bool = True):
+    """保存済みの要約から週次・月次ダイジェストを作成→Slack投稿（論文の再要約はしない）"""
+    import time
+    from digest import build_digest
+    from post_slack import post_digest_slack
+
+    start = time.perf_counter()
+    title, groups = build_digest(period, use_llm=use_llm)
+    print(f"[時間] ダイジェスト作成: {time.perf_counter() - start:.1f} 秒")
+
+    if not groups:
+        print("期間内に要約済みの論文はありません。")
+        return
+
+    post_digest_slack(title, groups)
 
 
 def run_bot():
@@ -30,15 +71,31 @@ def run_bot():
 
 def main():
     parser = argparse.ArgumentParser(description="Paper Summarizer Bot")
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
         "--bot",
         action="store_true",
         help="Slack Bot モードで起動 (URL を検知して要約を返信)",
     )
+    mode.add_argument(
+        "--digest",
+        choices=["week", "month"],
+        help="保存済みの要約から週次 (week) / 月次 (month) ダイジェストを投稿",
+    )
+    parser.add_argument(
+        "--no-llm",
+        action="store_true",
+        help="--digest の見出しを LLM ではなくキーワードで作る",
+    )
     args = parser.parse_args()
 
+    if args.no_llm and not args.digest:
+        parser.error("--no-llm は --digest と一緒に指定してください")
+
     if args.bot:
         run_bot()
+    elif args.digest:
+        run_digest(args.digest, use_llm=not args.no_llm)
     else:
         run_batch()
 
@@ -0,0 +1,219 @@
+"""
+取得した論文と生成した要約のローカル全文検索インデックス（SQLite FTS5）
+論文は arXiv ID、Web ページは正規化した URL をキーに保存し、
+Bot の search コマンドや同じ URL の再要約回避に使う
+"""
+
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parent.parent / "logs" / "papers.db"
+
+# trigram トークナイザは日本語の要約も部分一致で検索できる（3 文字未満の語は LIKE で補う）
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT,
+    url TEXT,
+    published TEXT,
+    summary TEXT,
+    fetched_at REAL,
+    summarized_at REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, summary,
+    content='documents', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, body, summary)
+    VALUES (new.rowid, new.title, new.body, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, body, summary)
+    VALUES ('delete', old.rowid, old.title, old.body, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, body, summary)
+    VALUES ('delete', old.rowid, old.title, old.body, old.summary);
+    INSERT INTO documents_fts(rowid, title, body, summary)
+    VALUES (new.rowid, new.title, new.body, new.summary);
+END;
+"""
+
+
+def _connect():
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def index_papers(papers) -> None:
+    """
+    fetch_papers で取得した論文をインデックスに登録する
+    既に要約が保存されている論文は要約を残したまま書誌情報だけ更新する
+    """
+    now = time.time()
+    rows = [
+        (p["id"], p["title"], p["summary"], p["url"], p["published"], now)
+        for p in papers
+    ]
+    if not rows:
+        return
+    with closing(_connect()) as conn, conn:
+        conn.executemany(
+            """
+            INSERT INTO documents (key, kind, title, body, url, published, fetched_at)
+            VALUES (?, 'paper', ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                title = excluded.title,
+                body = excluded.body,
+                url = excluded.url,
+                published = excluded.published,
+                fetched_at = excluded.fetched_at
+            """,
+            rows,
+        )
+
+
+def index_summary(
+    key: str,
+    kind: str,
+    title: str,
+    url: str,
+    summary: str,
+    body=None,
+    published=None,
+) -> None:
+    """
+    生成した要約を保存する
+    Args:
+        key (str): 論文なら arXiv ID、Web ページなら正規化した URL
+        kind (str): "paper" または "webpage"
+    """
+    now = time.time()
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            """
+            INSERT INTO documents
+                (key, kind, title, body, url, published, summary, fetched_at, summarized_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                title = excluded.title,
+                body = COALESCE(excluded.body, documents.body),
+                url = excluded.url,
+                published = COALESCE(excluded.published, documents.published),
+                summary = excluded.summary,
+                summarized_at = excluded.summarized_at
+            """,
+            (key, kind, title, body, url, published, summary, now, now),
+        )
+
+
+def find_summary(key: str, since: float = 0):
+    """
+    保存済みの要約を返す（無ければ None）
+    Args:
+        key (str): 文書のキー
+        since (float): この時刻（UNIX 時間）より前に作られた要約は無視する
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT summary FROM documents WHERE key = ? AND summarized_at >= ?",
+            (key, since),
+        ).fetchone()
+    return row["summary"] if row else None
+
+
+def find_paper_summary(arxiv_id: str):
+    """
+    バージョン違いも含めて論文の保存済み要約を返す（無ければ None）
+    Args:
+        arxiv_id (str): バージョン無しの arXiv ID（例: 2501.00001）
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            """
+            SELECT summary FROM documents
+            WHERE kind = 'paper' AND summary IS NOT NULL
+              AND (key = ? OR key LIKE ? || 'v%')
+            ORDER BY summarized_at DESC
+            LIMIT 1
+            """,
+            (arxiv_id, arxiv_id),
+        ).fetchone()
+    return row["summary"] if row else None
+
+
+def search(terms: str, limit: int = 5) -> list[dict]:
+    """
+    インデックスを全文検索する（BM25 順）
+    Args:
+        terms (str): 空白区切りの検索語（すべてを含むものを返す）
+        limit (int): 最大件数
+    Returns:
+        List[dict]: key, kind, title, url, published, summary, snippet
+    """
+    words = [w for w in re.split(r"\s+", terms.strip()) if w]
+    if not words:
+        return []
+
+    # FTS5 の構文として解釈されないよう語をクォートする
+    long_words = [w for w in words if len(w) >= 3]
+    short_words = [w for w in words if len(w) < 3]
+
+    conditions = []
+    params = []
+    if long_words:
+        conditions.append("documents_fts MATCH ?")
+        params.append(" ".join('"' + w.replace('"', '""') + '"' for w in long_words))
+    for w in short_words:
+        conditions.append("(d.title LIKE ? OR d.body LIKE ? OR d.summary LIKE ?)")
+        params.extend([f"%{w}%"] * 3)
+
+    if long_words:
+        sql = f"""
+            SELECT d.key, d.kind, d.title, d.url, d.published, d.summary,
+                   snippet(documents_fts, -1, '', '', '…', 48) AS snippet
+            FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid
+            WHERE {" AND ".join(conditions)}
+            ORDER BY bm25(documents_fts)
+            LIMIT ?
+        """
+    else:
+        sql = f"""
+            SELECT d.key, d.kind, d.title, d.url, d.published, d.summary,
+                   substr(COALESCE(d.body, d.summary, ''), 1, 120) AS snippet
+            FROM documents d
+            WHERE {" AND ".join(conditions)}
+            ORDER BY COALESCE(d.summarized_at, d.fetched_at) DESC
+            LIMIT ?
+        """
+    params.append(limit)
+
+    with closing(_connect()) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
+
+
+def recent_summaries(since: float, kind: str = "paper") -> list[dict]:
+    """
+    指定時刻（UNIX 時間）以降に要約された文書を新しい順に返す
+    """
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            """
+            SELECT key, kind, title, body, url, published, summary, summarized_at
+            FROM documents
+            WHERE kind = ? AND summary IS NOT NULL AND summarized_at >= ?
+            ORDER BY summarized_at DESC
+            """,
+            (kind, since),
+        ).fetchall()
+    return [dict(r) for r in rows]
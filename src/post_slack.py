@@ -2,6 +2,8 @@ import os
 import requests
 import dotenv
 
+from slack_format import escape_mrkdwn, link_text
+
 # .env または環境変数から取得
 dotenv.load_dotenv()
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL")
@@ -26,6 +28,39 @@ def post_papers_slack(papers):
             })
             blocks.append({"type": "divider"})  # 水平線
 
+    _post_blocks(blocks)
+
+
+def post_digest_slack(title, groups):
+    """
+    ダイジェストを Slack に投稿
+    Args:
+        title (str): ダイジェストの見出し
+        groups (list[dict]): headline, keywords, papers（各論文は excerpt 付き）を持つグループ
+    """
+    blocks = [{"type": "header", "text": {"type": "plain_text", "text": title[:150]}}]
+    for group in groups:
+        headline = escape_mrkdwn(group["headline"]).replace("*", "")
+        lines = [f"*{headline}*"]
+        for paper in group["papers"]:
+            lines.append(f"• <{paper['url']}|{link_text(paper['title'])}>")
+            if paper.get("excerpt"):
+                lines.append(f"    {escape_mrkdwn(paper['excerpt'])}")
+        blocks.append({
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": "\n".join(lines)[:3000]},
+        })
+        if group["keywords"]:
+            blocks.append({
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": "キーワード: " + escape_mrkdwn(", ".join(group["keywords"]))}],
+            })
+        blocks.append({"type": "divider"})
+
+    _post_blocks(blocks)
+
+
+def _post_blocks(blocks):
     payload = {"blocks": blocks}
     response = requests.post(SLACK_WEBHOOK_URL, json=payload)
 
@@ -6,6 +6,7 @@ Web ページの内容を取得・要約してスレッドに返信する
 """
 
 import os
+import re
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -18,6 +19,11 @@ from slack_bolt.adapter.socket_mode import SocketModeHandler
 
 from fetch_url import extract_urls, fetch_webpage_text
 from summarize import unload_model
+from paper_index import (
+    find_paper_summary, find_summary, index_papers, index_summary, search,
+)
+from slack_format import escape_mrkdwn, unescape_mrkdwn
+import url_cache
 
 # --- ログ設定（コンソール + ファイル） ---
 LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
@@ -58,12 +64,22 @@ app = App(token=SLACK_BOT_TOKEN)
 # メインスレッドで実行するためのキュー
 _task_queue = queue.Queue()
 
+# search コマンドで返す最大件数
+SEARCH_LIMIT = 5
+
+# arXiv の abs / pdf URL から論文 ID（バージョン無し）を取り出す
+_ARXIV_URL_RE = re.compile(
+    r"^https?://(?:www\.|export\.)?arxiv\.org/(?:abs|pdf)/(.+?)(?:v\d+)?(?:\.pdf)?/?(?:[?#].*)?$",
+    re.IGNORECASE,
+)
+
 
 @app.event("app_mention")
 def handle_mention(event, say, client):
     """
     Bot へのメンションを検知し、URL が含まれていれば
     即座に「要約を開始します」と返信してからモデルをロード→要約→結果返信
+    「search <語>」の場合はローカルインデックスから即答する
     """
     logger.info(f"app_mention イベント受信: {event}")
 
@@ -74,11 +90,18 @@ def handle_mention(event, say, client):
 
     logger.info(f"メンション from user={user}, channel={channel}, text={text}")
 
+    # search コマンド: モデルを使わずインデックスから返信
+    command = re.sub(r"<@[^>]+>", "", text).strip()
+    match = re.match(r"(?:search|検索)\s+(.+)", command, re.IGNORECASE | re.DOTALL)
+    if match:
+        say(text=_search_reply(unescape_mrkdwn(match.group(1).strip())), thread_ts=ts)
+        return
+
     # URL を抽出
     urls = extract_urls(text)
     if not urls:
         logger.info("URL なし — ヘルプメッセージを返信")
-        say(text="URL が見つかりませんでした。要約したい URL を含めてメンションしてください。", thread_ts=ts)
+        say(text="URL が見つかりませんでした。要約したい URL を含めてメンションするか、「search <キーワード>」で過去の論文・要約を検索してください。", thread_ts=ts)
         return
 
     logger.info(f"URL 検出: {urls}")
@@ -87,6 +110,17 @@ def handle_mention(event, say, client):
     from summarize_url import summarize_webpage
 
     for url in urls:
+        # 要約済みの arXiv 論文はインデックスから返信（推論しない）
+        arxiv_match = _ARXIV_URL_RE.match(url)
+        stored = (
+            _find_stored_summary(find_paper_summary, arxiv_match.group(1))
+            if arxiv_match else None
+        )
+        if stored:
+            logger.info(f"要約済み論文のため保存済み要約を返信: {url}")
+            say(text=stored, thread_ts=ts)
+            continue
+
         # タスクをキューに入れてメインスレッドで処理
         _task_queue.put({
             "url": url,
@@ -95,6 +129,77 @@ def handle_mention(event, say, client):
             "client": client,
         })
 
+
+def _find_stored_summary(find, *args, **kwargs):
+    """
+    インデックスから保存済み要約を引く
+    DB エラーはログに残してミス扱い（None）にし、通常の要約処理にフォールバックさせる
+    """
+    try:
+        return find(*args, **kwargs)
+    except Exception:
+        logger.error("保存済み要約の検索に失敗", exc_info=True)
+        return None
+
+
+def _search_reply(terms: str) -> str:
+    """
+    インデックスを検索して返信テキストを作る
+    ヒットしなければ arXiv を検索し、結果をインデックスに登録する
+    """
+    try:
+        hits = search(terms, limit=SEARCH_LIMIT)
+    except Exception:
+        # インデックスが使えなくても arXiv 検索で応答する
+        logger.error(f"インデックス検索に失敗: {terms}", exc_info=True)
+        hits = []
+    source = "インデックス"
+
+    if not hits:
+        from fetch_papers import fetch_papers
+
+        try:
+            papers = [
+                p.to_dict() for p in fetch_papers(query=terms, max_results=SEARCH_LIMIT)
+            ]
+        except Exception as e:
+            logger.error(f"arXiv 検索に失敗: {terms}", exc_info=True)
+            return f"❌ 検索に失敗しました: {e}"
+        index_papers(papers)
+        hits = [
+            {
+                "title": p["title"],
+                "url": p["url"],
+                "published": p["published"],
+                "summary": None,
+                "snippet": p["summary"][:200],
+            }
+            for p in papers
+        ]
+        source = "arXiv"
+
+    # 検索語・タイトル・本文の抜粋はそのまま mrkdwn に入れない（<!channel> などを無効化）
+    quoted_terms = escape_mrkdwn(terms)
+    if not hits:
+        return f"🔎 「{quoted_terms}」に一致する論文・要約は見つかりませんでした。"
+
+    lines = [f"🔎 「{quoted_terms}」の検索結果（{source}）"]
+    for h in hits:
+        published = f" ({h['published']})" if h.get("published") else ""
+        mark = " 📝要約あり" if h.get("summary") else ""
+        title = escape_mrkdwn(h["title"]).replace("*", "")
+        lines.append(f"• *{title}* <{h['url']}|[link]>{published}{mark}")
+        if h.get("snippet"):
+            lines.append(f"    {escape_mrkdwn(h['snippet'])}")
+
+    # 先頭のヒットに要約があればそのまま添える
+    if hits[0].get("summary"):
+        lines.append("")
+        lines.append(hits[0]["summary"])
+
+    return "\n".join(lines)
+
+
 def _safe_reaction(client, channel, timestamp, reaction_name):
     """Slack API のエラーを無視して安全にリアクションを追加する"""
     try:
@@ -117,14 +222,9 @@ def _process_task(task):
 
     try:
         logger.info(f"Fetching URL: {url}")
-        # _safe_reaction(client, channel, ts, "hourglass_flowing_sand")
-        client.chat_postMessage(
-            channel=channel, thread_ts=ts,
-            text=f"📖 要約を開始します。モデルをロード中..."
-        )
-
         from fetch_url import fetch_webpage_text
         page_data = fetch_webpage_text(url)
+        logger.info(f"URL キャッシュ統計: {url_cache.get_stats()}")
 
         if page_data.get("error"):
             client.chat_postMessage(
@@ -133,12 +233,36 @@ def _process_task(task):
             )
             return
 
+        # ページが要約後に変わっていなければ（キャッシュが新鮮 or 304）保存済みの要約を返す
+        stored = _find_stored_summary(
+            find_summary, url_cache.normalize_url(url), since=page_data["fetched_at"]
+        )
+        if stored:
+            logger.info(f"ページ未更新のため保存済み要約を返信: {url}")
+            client.chat_postMessage(channel=channel, thread_ts=ts, text=stored)
+            return
+
+        # _safe_reaction(client, channel, ts, "hourglass_flowing_sand")
+        client.chat_postMessage(
+            channel=channel, thread_ts=ts,
+            text=f"📖 要約を開始します。モデルをロード中..."
+        )
+
         from summarize_url import summarize_webpage
         summary = summarize_webpage(page_data)
 
         client.chat_postMessage(channel=channel, thread_ts=ts, text=summary)
         # _safe_reaction(client, channel, ts, "white_check_mark")
 
+        # インデックスへの保存に失敗しても返信済みの要約には影響させない
+        try:
+            index_summary(
+                url_cache.normalize_url(url), "webpage", page_data["title"], url,
+                summary, body=page_data["text"],
+            )
+        except Exception:
+            logger.error(f"要約のインデックス登録に失敗: {url}", exc_info=True)
+
         from summarize import unload_model
         unload_model()
         logger.info("要約完了・モデル解放")
@@ -0,0 +1,18 @@
+"""
+Slack mrkdwn に埋め込むテキストの整形
+"""
+
+
+def escape_mrkdwn(text: str) -> str:
+    """Slack mrkdwn の制御文字 (&, <, >) をエスケープ"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def unescape_mrkdwn(text: str) -> str:
+    """Slack から届いたテキストのエスケープ (&amp; &lt; &gt;) を元に戻す"""
+    return text.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+
+
+def link_text(text: str) -> str:
+    """<URL|テキスト> のテキスト部分用にエスケープ（| はリンクの区切りと解釈されるので置き換える）"""
+    return escape_mrkdwn(text).replace("|", "｜")
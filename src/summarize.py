@@ -1,5 +1,13 @@
 import re
+import sys
+import time
+import queue
+import signal
 import logging
+import traceback
+import multiprocessing
+
+from paper_index import index_summary
 
 logger = logging.getLogger(__name__)
 
@@ -109,10 +117,183 @@ def summarize_papers_vllm(papers):
     summarized = []
     for p in papers:
         slack_summary = summarize_paper_vllm(p)
+        # インデックスへの保存に失敗しても要約・投稿は続ける
+        try:
+            index_summary(
+                p["id"], "paper", p["title"], p["url"], slack_summary,
+                body=p["summary"], published=p["published"],
+            )
+        except Exception:
+            logger.error(f"要約のインデックス登録に失敗: {p['id']}", exc_info=True)
         summarized.append({**p, "slack_summary": slack_summary})
     return summarized
 
 
+def generate_digest_headlines(groups):
+    """
+    ダイジェストの各グループに付ける短い見出しを生成
+    グループごとに 1 プロンプトをまとめて 1 回の generate で推論する
+    Args:
+        groups (list[list[str]]): グループごとの論文タイトル
+    Returns:
+        list[str]: グループごとの見出し（生成に失敗したものは空文字）
+    """
+    from vllm import SamplingParams
+    from openai_harmony import (
+        Conversation, Message, Role, SystemContent, DeveloperContent, ReasoningEffort,
+    )
+
+    model, encoding = _get_model()
+
+    prompts = []
+    for titles in groups:
+        title_lines = "\n".join(f"- {t}" for t in titles)
+        user_prompt = f"""
+            以下の論文群に共通するトピックを、日本語の短い見出し（20文字程度）で1行だけ出力してください。
+            記号や装飾は付けないでください。
+
+            {title_lines}
+        """
+        convo = Conversation.from_messages(
+            [
+                Message.from_role_and_content(
+                    Role.SYSTEM,
+                    SystemContent.new().with_reasoning_effort(ReasoningEffort.LOW),
+                ),
+                Message.from_role_and_content(Role.DEVELOPER, DeveloperContent.new().with_instructions("あなたは、自然言語処理の論文を分類するアシスタントです。"),
+                ),
+                Message.from_role_and_content(Role.USER, user_prompt),
+            ]
+        )
+        prompts.append(encoding.render_conversation_for_completion(convo, Role.ASSISTANT))
+
+    sampling_params = SamplingParams(
+        max_tokens=512,
+        temperature=0.3,
+        stop_token_ids=encoding.stop_tokens_for_assistant_actions(),
+    )
+
+    outputs = model.generate(
+        prompt_token_ids=prompts,
+        sampling_params=sampling_params,
+    )
+
+    headlines = []
+    for output in outputs:
+        try:
+            entries = encoding.parse_messages_from_completion_tokens(
+                output.outputs[0].token_ids, Role.ASSISTANT
+            )
+        except Exception:
+            # max_tokens で途中終了した場合などはキーワードの見出しにフォールバック
+            logger.warning("見出しのパースに失敗しました", exc_info=True)
+            entries = []
+        texts = []
+        for e in entries:
+            if e.channel == "final" and hasattr(e, "content"):
+                for c in e.content:
+                    if hasattr(c, "text"):
+                        texts.append(c.text)
+        headline = "".join(texts).strip().splitlines()
+        headlines.append(headline[0].strip("*# ") if headline else "")
+    return headlines
+
+
+def _summarize_worker(task_queue, result_queue):
+    """
+    別プロセスでモデルをロードし、渡された論文を要約する
+    None を受け取った場合は要約せずに終了する
+    """
+    # terminate() 時も vLLM の終了処理が走るよう SystemExit に変換する
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        start = time.perf_counter()
+        _get_model()
+        result_queue.put(("ready", time.perf_counter() - start))
+
+        papers = task_queue.get()
+        if papers is None:
+            return
+
+        start = time.perf_counter()
+        summarized = summarize_papers_vllm(papers)
+        result_queue.put(("done", (summarized, time.perf_counter() - start)))
+    except Exception:
+        result_queue.put(("error", traceback.format_exc()))
+
+
+class BackgroundSummarizer:
+    """
+    モデル（と Harmony エンコーディング）のロードを別プロセスで先に開始し、
+    論文が揃った時点で要約を依頼する
+    vLLM はメインスレッド以外での初期化に対応しないため、スレッドではなくプロセスを使う
+    """
+
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        # vLLM が子プロセスを作るので daemon にはしない
+        self._process = ctx.Process(
+            target=_summarize_worker, args=(self._tasks, self._results)
+        )
+        self._process.start()
+        self.load_seconds = None
+        self.summarize_seconds = None
+
+    def _get_result(self):
+        """ワーカーからの結果を待つ（ワーカーが異常終了した場合は例外）"""
+        while True:
+            try:
+                return self._results.get(timeout=5)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                try:
+                    return self._results.get(timeout=1)
+                except queue.Empty:
+                    raise RuntimeError(
+                        f"要約プロセスが異常終了しました (exitcode={self._process.exitcode})"
+                    )
+
+    def summarize(self, papers):
+        """
+        モデルのロード完了を待って論文を要約する
+        Args:
+            papers (list[dict]): 要約する論文
+        Returns:
+            list[dict]: slack_summary を追加した論文
+        """
+        self._tasks.put(papers)
+        kind, value = self._get_result()
+        if kind == "ready":
+            self.load_seconds = value
+            kind, value = self._get_result()
+        self._process.join()
+
+        if kind == "error":
+            raise RuntimeError(f"要約プロセスでエラーが発生しました:\n{value}")
+        summarized, self.summarize_seconds = value
+        return summarized
+
+    def cancel(self):
+        """
+        ロード中・待機中のワーカーを停止する（終了済みなら何もしない）
+        待機中なら None を送って自発的に終了させ、終わらなければ terminate する
+        """
+        if not self._process.is_alive():
+            return
+        self._tasks.put(None)
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=30)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        logger.info("要約プロセスを停止しました")
+
+
 def unload_model():
     """モデルを GPU メモリから解放"""
     global _model, _encoding
@@ -0,0 +1,198 @@
+"""
+Web ページ取得結果のディスクキャッシュ
+正規化した URL をキーに、抽出済みのタイトル・本文と ETag / Last-Modified を保存し、
+TTL 切れのエントリは条件付き GET (If-None-Match / If-Modified-Since) で再検証する
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "logs" / "url_cache"
+
+# この秒数以内のエントリはネットワークに問い合わせず再利用する
+CACHE_TTL = 60 * 60
+# この秒数を超えて更新されていないエントリは削除する
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+# キャッシュ全体の上限サイズ（超えたら古いものから削除）
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# 正規化時に取り除くトラッキング用クエリパラメータ（utm_* とあわせて除去）
+_TRACKING_PARAMS = {"fbclid", "gclid"}
+
+_stats = {"hit": 0, "revalidate": 0, "miss": 0}
+
+
+def normalize_url(url: str) -> str:
+    """
+    キャッシュキー用に URL を正規化する
+    - スキーム・ホストを小文字化、デフォルトポートとフラグメントを除去
+    - utm_* などのトラッキング用パラメータを除去し、クエリをソート
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (
+        scheme == "https" and netloc.endswith(":443")
+    ):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.startswith("utm_") and k not in _TRACKING_PARAMS
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+
+def _cache_path(url: str) -> Path:
+    key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{key}.json"
+
+
+def load(url: str):
+    """
+    キャッシュエントリを読み込む（存在しない・壊れている場合は None）
+    """
+    path = _cache_path(url)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(entry: dict) -> bool:
+    """TTL 内であれば再検証なしで使える"""
+    return time.time() - entry.get("stored_at", 0) < CACHE_TTL
+
+
+def conditional_headers(entry) -> dict:
+    """
+    条件付き GET 用のヘッダーを返す（検証子が無ければ空）
+    """
+    if not entry:
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _write(path: Path, entry: dict):
+    """一時ファイル経由で書き込み、途中で落ちても壊れたエントリや一時ファイルを残さない"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _save(url: str, entry: dict):
+    """
+    エントリを保存して古いエントリを掃除する
+    キャッシュはベストエフォートなので、書き込みに失敗してもログに残すだけにする
+    """
+    try:
+        _write(_cache_path(url), entry)
+        evict()
+    except OSError:
+        logger.warning(f"URL キャッシュの書き込みに失敗: {url}", exc_info=True)
+
+
+def store(url: str, title: str, text: str, response_headers) -> dict:
+    """
+    抽出結果を検証子と一緒に保存し、保存したエントリを返す
+    """
+    now = time.time()
+    entry = {
+        "url": normalize_url(url),
+        "title": title,
+        "text": text,
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+        "stored_at": now,
+        # 本文を抽出した時刻（304 で再検証しても変わらない）
+        "fetched_at": now,
+    }
+    _save(url, entry)
+    return entry
+
+
+def mark_miss() -> None:
+    """キャッシュを使えず通常の GET を送った（エラーや PDF になった場合も含む）"""
+    _stats["miss"] += 1
+
+
+def mark_hit(entry: dict) -> dict:
+    """TTL 内のエントリを再利用した"""
+    _stats["hit"] += 1
+    return entry
+
+
+def mark_revalidated(url: str, entry: dict, response_headers) -> dict:
+    """
+    304 Not Modified を受けたエントリの TTL を延長して再利用する
+    """
+    _stats["revalidate"] += 1
+    entry["etag"] = response_headers.get("ETag") or entry.get("etag")
+    entry["last_modified"] = (
+        response_headers.get("Last-Modified") or entry.get("last_modified")
+    )
+    entry["stored_at"] = time.time()
+    _save(url, entry)
+    return entry
+
+
+def evict() -> None:
+    """
+    CACHE_MAX_AGE を過ぎたエントリを削除し、
+    合計サイズが CACHE_MAX_BYTES を超えていれば古い順に削除する
+    """
+    if not CACHE_DIR.exists():
+        return
+
+    now = time.time()
+    entries = []
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        if now - st.st_mtime > CACHE_MAX_AGE:
+            path.unlink(missing_ok=True)
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= CACHE_MAX_BYTES:
+        return
+
+    entries.sort()
+    removed = 0
+    for _, size, path in entries:
+        if total <= CACHE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    logger.info(f"URL キャッシュ: サイズ上限超過のため {removed} 件を削除")
+
+
+def get_stats() -> dict:
+    """hit / revalidate / miss の件数を返す"""
+    return dict(_stats)